@@ -1,10 +1,16 @@
-import time
+import logging
+import mmap
 import threading
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-from config import HEARTBEAT_INTERVAL
+from config import CHUNK_SIZE, HEARTBEAT_INTERVAL
 from master import GFSMaster
 
+logger = logging.getLogger(__name__)
+
+LOCK_STRIPES = 32  # must be a power of two
+CHUNKS_PER_SLAB = 16  # chunk buffers carved from each anonymous mapping
+
 
 class GFSChunkserver:
     """The Chunkserver - stores actual data"""
@@ -12,14 +18,22 @@ class GFSChunkserver:
     def __init__(self, chunkserver_id: str, master: GFSMaster):
         self.chunkserver_id = chunkserver_id
         self.master = master
-        self.chunks: Dict[str, bytearray] = {}  # chunk_id -> data
-        self.lock = threading.RLock()
+        self.chunks: Dict[str, memoryview] = {}  # chunk_id -> CHUNK_SIZE slice of a slab
+        self.chunk_sizes: Dict[str, int] = {}  # chunk_id -> bytes written (high-water mark)
+        # Striped locks: operations on different chunks rarely share a lock
+        self.chunk_locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+        
+        # Buffer pool: one kernel mapping per CHUNKS_PER_SLAB chunks rather
+        # than per chunk, so replicas do not exhaust vm.max_map_count
+        self.slabs: List[memoryview] = []
+        self.slab_slots_used = 0
+        self.slab_lock = threading.Lock()
         
         # Register with master
         self.master.register_chunkserver(self.chunkserver_id, list(self.chunks.keys()))
         
         # Initialize state
-        self.heartbeat_monitoring_active = True
+        self.heartbeat_stop = threading.Event()
         
         # Start heartbeat
         self.start_heartbeat()
@@ -31,47 +45,70 @@ class GFSChunkserver:
     
     def _send_heartbeats(self):
         """Send periodic heartbeats to master"""
-        while self.heartbeat_monitoring_active:
+        while True:
             self.master.heartbeat(self.chunkserver_id)
-            time.sleep(HEARTBEAT_INTERVAL)
+            # Returns early (True) as soon as shutdown() sets the event
+            if self.heartbeat_stop.wait(HEARTBEAT_INTERVAL):
+                break
+    
+    def _chunk_lock(self, chunk_id: str):
+        """Return the lock stripe guarding a chunk"""
+        return self.chunk_locks[hash(chunk_id) & (LOCK_STRIPES - 1)]
+    
+    def _reserve_chunk_buffer(self) -> memoryview:
+        """Carve a CHUNK_SIZE buffer from the slab pool, growing it by one slab when full"""
+        with self.slab_lock:
+            slot = self.slab_slots_used % CHUNKS_PER_SLAB
+            if slot == 0:
+                # Anonymous mapping: zero-filled lazily by the OS
+                self.slabs.append(memoryview(mmap.mmap(-1, CHUNK_SIZE * CHUNKS_PER_SLAB)))
+            self.slab_slots_used += 1
+            start = slot * CHUNK_SIZE
+            return self.slabs[-1][start:start + CHUNK_SIZE]
     
-    def create_chunk(self, chunk_id: str, version: int):
+    def create_chunk(self, chunk_id: str, version: int) -> bool:
         """Create a new chunk"""
-        with self.lock:
-            self.chunks[chunk_id] = bytearray()
-            print(f"[{self.chunkserver_id}] Created chunk: {chunk_id} (version {version})")
+        with self._chunk_lock(chunk_id):
+            try:
+                buffer = self._reserve_chunk_buffer()
+            except OSError as e:
+                logger.warning("[%s] Cannot allocate chunk %s: %s", self.chunkserver_id, chunk_id, e)
+                return False
+            
+            # The view is built once here rather than on every append/read
+            self.chunks[chunk_id] = buffer
+            self.chunk_sizes[chunk_id] = 0
+            logger.debug("[%s] Created chunk: %s (version %d)", self.chunkserver_id, chunk_id, version)
+            return True
     
     def append_data_to_chunk(self, chunk_id: str, data: bytes, offset: int) -> bool:
         """Append data to a chunk at specified offset"""
-        with self.lock:
-            if chunk_id not in self.chunks:
+        with self._chunk_lock(chunk_id):
+            chunk = self.chunks.get(chunk_id)
+            end = offset + len(data)
+            if chunk is None or end > CHUNK_SIZE:
                 return False
             
-            chunk = self.chunks[chunk_id]
-            
-            # Extend chunk if necessary pad the chunk with null bytes 
-            if offset > len(chunk):
-                chunk.extend(b'\x00' * (offset - len(chunk)))
-            
-            # Append data
-            if offset == len(chunk):
-                chunk.extend(data)
-            else:
-                chunk[offset:offset+len(data)] = data #Overwrite the data at the offset
+            # Copy in place; the gap before offset is already zero-filled
+            chunk[offset:end] = data
+            if end > self.chunk_sizes[chunk_id]:
+                self.chunk_sizes[chunk_id] = end
             
-            print(f"[{self.chunkserver_id}] Appended {len(data)} bytes to {chunk_id} at offset {offset}")
+            logger.debug("[%s] Appended %d bytes to %s at offset %d",
+                         self.chunkserver_id, len(data), chunk_id, offset)
             return True
     
-    def read_chunk(self, chunk_id: str, offset: int, length: int) -> Optional[bytes]:
-        """Read data from a chunk"""
-        with self.lock:
-            if chunk_id not in self.chunks:
+    def read_chunk(self, chunk_id: str, offset: int, length: int) -> Optional[memoryview]:
+        """Read data from a chunk (zero-copy view into the chunk buffer)"""
+        with self._chunk_lock(chunk_id):
+            chunk = self.chunks.get(chunk_id)
+            if chunk is None:
                 return None
             
-            chunk = self.chunks[chunk_id]
-            end = min(offset + length, len(chunk))
-            return bytes(chunk[offset:end])
+            end = min(offset + length, self.chunk_sizes[chunk_id])
+            return chunk[offset:end]
     
     def shutdown(self):
         """Shutdown the chunkserver"""
-        self.heartbeat_monitoring_active = False
\ No newline at end of file
+        self.heartbeat_stop.set()
+        self.heartbeat_thread.join()
\ No newline at end of file
@@ -1,9 +1,16 @@
+import logging
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, Optional
 
-from config import CHUNK_SIZE
+from config import CHUNK_SIZE, REPLICATION_FACTOR, METADATA_CACHE_TTL, METADATA_CACHE_SIZE, READ_PARALLELISM
 from master import GFSMaster
 from chunkserver import GFSChunkserver
 
+logger = logging.getLogger(__name__)
+
 
 class GFSClient:
     """The Client - application interface to GFS"""
@@ -11,7 +18,16 @@ class GFSClient:
     def __init__(self, master: GFSMaster, chunkservers: Dict[str, GFSChunkserver]):
         self.master = master
         self.chunkservers = chunkservers
-        self.metadata_cache: Dict[str, dict] = {}  # Simple cache
+        # LRU cache: filename -> {'timestamp', 'layout'}
+        self.metadata_cache: "OrderedDict[str, dict]" = OrderedDict()
+        # Bumped on every invalidation, so a fetch that raced with an append
+        # does not store its (possibly stale) result. One counter per client
+        # keeps this bounded; a bump only costs concurrent fetches a re-fetch.
+        self.metadata_generation = 0
+        self.cache_lock = threading.Lock()
+        # Separate pools so a large read never queues ahead of an append's replica writes
+        self.replica_pool = ThreadPoolExecutor(max_workers=REPLICATION_FACTOR)
+        self.read_pool = ThreadPoolExecutor(max_workers=READ_PARALLELISM)
     
     def create(self, filename: str) -> bool:
         """Create a new file"""
@@ -22,9 +38,19 @@ class GFSClient:
         # Get or allocate chunk
         chunk_info = self.master.allocate_chunk_for_append(filename)
         if not chunk_info:
-            print(f"[Client] Failed to allocate chunk for {filename}")
+            logger.warning("[Client] Failed to allocate chunk for %s", filename)
             return False
         
+        # The master's chunk list (and, on success, size) has changed. Drop
+        # cached metadata only once the append settles, so a concurrent read
+        # cannot re-cache the pre-append view after we invalidate.
+        try:
+            return self._write_chunk(filename, chunk_info, data)
+        finally:
+            self._invalidate_metadata(filename)
+    
+    def _write_chunk(self, filename: str, chunk_info: Dict, data: bytes) -> bool:
+        """Write data to a freshly allocated chunk on all its replicas"""
         chunk_id = chunk_info['chunk_id']
         primary_id = chunk_info['primary']
         locations = chunk_info['locations']
@@ -32,13 +58,14 @@ class GFSClient:
         
         # Create chunk on all replicas
         for cs_id in locations:
-            if cs_id in self.chunkservers:
-                self.chunkservers[cs_id].create_chunk(chunk_id, version)
+            if cs_id in self.chunkservers and not self.chunkservers[cs_id].create_chunk(chunk_id, version):
+                logger.warning("[Client] Failed to create chunk %s on %s", chunk_id, cs_id)
+                return False
         
         # Get primary chunkserver
         primary = self.chunkservers.get(primary_id)
         if not primary:
-            print(f"[Client] Primary chunkserver {primary_id} not available")
+            logger.warning("[Client] Primary chunkserver %s not available", primary_id)
             return False
         
         # Primary determines the offset (append point)
@@ -48,40 +75,90 @@ class GFSClient:
         if not primary.append_data_to_chunk(chunk_id, data, offset):
             return False
         
-        # Replicate to secondaries
-        for cs_id in locations:
-            if cs_id != primary_id and cs_id in self.chunkservers:
-                self.chunkservers[cs_id].append_data_to_chunk(chunk_id, data, offset)
+        # Replicate to secondaries in parallel
+        futures = [
+            self.replica_pool.submit(self.chunkservers[cs_id].append_data_to_chunk, chunk_id, data, offset)
+            for cs_id in locations
+            if cs_id != primary_id and cs_id in self.chunkservers
+        ]
+        wait(futures)
+        if not all(future.result() for future in futures):
+            logger.warning("[Client] Replication to secondaries failed for %s", filename)
+            return False
         
-        print(f"[Client] Successfully appended {len(data)} bytes to {filename}")
+        self.master.update_file_size(filename, len(data))
+        logger.debug("[Client] Successfully appended %d bytes to %s", len(data), filename)
         return True
     
     def read(self, filename: str) -> Optional[bytes]:
         """Read entire file"""
-        file_info = self.master.get_file_info(filename)
-        if not file_info:
-            print(f"[Client] File not found: {filename}")
+        layout = self._get_file_layout(filename)
+        if not layout:
+            logger.warning("[Client] File not found: %s", filename)
             return None
         
-        result = bytearray()
-        num_chunks = file_info['num_chunks']
+        # Fetch the chunks in parallel, copying each straight into a
+        # buffer allocated once at the file's size (no growth reallocations)
+        size = layout['size']
+        result = bytearray(size)
+        pos = 0
+        for data in self.read_pool.map(self._read_chunk_data, layout['chunks']):
+            if data:
+                n = len(data)
+                result[pos:pos+n] = data
+                pos += n
+        
+        # A chunk with no reachable replica leaves the tail unfilled; trim it
+        # in place rather than returning zero padding
+        if pos < size:
+            del result[pos:]
+        
+        logger.debug("[Client] Read %d bytes from %s", pos, filename)
+        return bytes(result)
+    
+    def _get_file_layout(self, filename: str) -> Optional[Dict]:
+        """Get file size and chunk locations, from cache when fresh"""
+        with self.cache_lock:
+            entry = self.metadata_cache.get(filename)
+            if entry and time.time() - entry['timestamp'] < METADATA_CACHE_TTL:
+                self.metadata_cache.move_to_end(filename)
+                return entry['layout']
+            generation = self.metadata_generation
         
-        # Read all chunks sequentially
-        for chunk_idx in range(num_chunks):
-            chunk_info = self.master.get_chunk_locations(filename, chunk_idx)
-            if not chunk_info:
-                continue
-            
-            chunk_id = chunk_info['chunk_id']
-            locations = chunk_info['locations']
-            
-            # Try to read from any replica
-            for cs_id in locations:
-                if cs_id in self.chunkservers:
-                    data = self.chunkservers[cs_id].read_chunk(chunk_id, 0, CHUNK_SIZE)
-                    if data:
-                        result.extend(data)
-                        break
+        # One master lookup for the size and every chunk
+        layout = self.master.get_file_layout(filename)
+        if not layout:
+            return None
         
-        print(f"[Client] Read {len(result)} bytes from {filename}")
-        return bytes(result)
\ No newline at end of file
+        with self.cache_lock:
+            if self.metadata_generation != generation:
+                return layout
+            self.metadata_cache[filename] = {
+                'timestamp': time.time(),
+                'layout': layout
+            }
+            self.metadata_cache.move_to_end(filename)
+            if len(self.metadata_cache) > METADATA_CACHE_SIZE:
+                self.metadata_cache.popitem(last=False)
+        return layout
+    
+    def _invalidate_metadata(self, filename: str):
+        """Drop cached metadata for a file"""
+        with self.cache_lock:
+            self.metadata_cache.pop(filename, None)
+            self.metadata_generation += 1
+    
+    def _read_chunk_data(self, chunk_info: Dict) -> Optional[memoryview]:
+        """Read a whole chunk from the first replica that has it"""
+        chunk_id = chunk_info['chunk_id']
+        for cs_id in chunk_info['locations']:
+            if cs_id in self.chunkservers:
+                data = self.chunkservers[cs_id].read_chunk(chunk_id, 0, CHUNK_SIZE)
+                if data:
+                    return data
+        return None
+    
+    def shutdown(self):
+        """Shutdown the client"""
+        self.replica_pool.shutdown(wait=True)
+        self.read_pool.shutdown(wait=True)
\ No newline at end of file
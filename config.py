@@ -1,4 +1,7 @@
 CHUNK_SIZE = 64 * 1024 * 1024  # 64 MB
 REPLICATION_FACTOR = 3
 LEASE_TIMEOUT = 60  # seconds
-HEARTBEAT_INTERVAL = 10  # seconds
\ No newline at end of file
+HEARTBEAT_INTERVAL = 10  # seconds
+METADATA_CACHE_TTL = 30  # seconds, kept below LEASE_TIMEOUT so locations refresh
+METADATA_CACHE_SIZE = 1024  # max files whose metadata a client caches
+READ_PARALLELISM = 8  # chunks a client fetches concurrently per read
\ No newline at end of file
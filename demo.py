@@ -1,3 +1,4 @@
+import logging
 import time
 
 from master import GFSMaster
@@ -6,6 +7,10 @@ from client import GFSClient
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Show the per-operation chunkserver and client traces too
+    logging.getLogger("chunkserver").setLevel(logging.DEBUG)
+    logging.getLogger("client").setLevel(logging.DEBUG)
     print("=== GFS Implementation Demo ===\n")
     
     # Initialize GFS cluster
@@ -46,6 +51,7 @@ if __name__ == "__main__":
     
     # Cleanup
     print("\n--- Shutting down ---")
+    client.shutdown()
     master.shutdown_heartbeat_monitoring()
     cs1.shutdown()
     cs2.shutdown()
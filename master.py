@@ -1,27 +1,39 @@
+import logging
 import time
 import threading
-import hashlib
-import random
-from typing import Dict, List, Optional
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
 
 from metadata import ChunkMetadata, FileMetadata
+from rwlock import RWLock
 from config import REPLICATION_FACTOR, LEASE_TIMEOUT, HEARTBEAT_INTERVAL
 
+logger = logging.getLogger(__name__)
+
 
 class GFSMaster:
     """The Master server - coordinator and metadata manager"""
     
     def __init__(self):
-        self.lock = threading.RLock()
+        self.lock = RWLock()  # Lookups share it; mutations take it exclusively
         
         # Metadata stored in memory
         self.file_registry: Dict[str, FileMetadata] = {}  # filename -> FileMetadata
         self.chunk_metadata: Dict[str, ChunkMetadata] = {}  # chunk_id -> ChunkMetadata
         self.chunkservers: Dict[str, dict] = {}  # chunkserver_id -> info
+        self.next_chunk_handle = 0  # Monotonic counter; handles only need to be unique
+        self.primary_counts: Dict[str, int] = {}  # chunkserver_id -> leases granted
         
-        # Chunkserver heartbeats
+        # Chunkserver liveness, guarded by its own small lock so it never waits
+        # on metadata operations (lock order: self.lock first). Steady-state
+        # heartbeats only write last_heartbeat and take no lock at all.
+        self.heartbeat_lock = threading.Lock()
         self.last_heartbeat: Dict[str, float] = {}
-        self.heartbeat_monitoring_active = True
+        self.live_chunkservers: Set[str] = set()  # Updated on heartbeat / death only
+        # Min-heap of (chunk count, chunkserver_id) for placement. Entries whose
+        # count no longer matches, or whose server is dead, are dropped lazily.
+        self.load_heap: List[Tuple[int, str]] = []
+        self.heartbeat_stop = threading.Event()
         
         # Start heartbeat monitor
         self.start_heartbeat_monitor()
@@ -33,51 +45,92 @@ class GFSMaster:
     
     def register_chunkserver(self, chunkserver_id: str, chunks: List[str]):
         """Register a chunkserver and its chunks"""
-        with self.lock:
+        with self.lock.write_lock():
             self.chunkservers[chunkserver_id] = {
                 'id': chunkserver_id,
                 'chunks': set(chunks)
             }
-            self.last_heartbeat[chunkserver_id] = time.time()
+            with self.heartbeat_lock:
+                self.last_heartbeat[chunkserver_id] = time.time()
+                self.live_chunkservers.add(chunkserver_id)
+                heapq.heappush(self.load_heap, (len(chunks), chunkserver_id))
             
             # Update chunk locations
             for chunk_id in chunks:
                 if chunk_id in self.chunk_metadata:
                     self.chunk_metadata[chunk_id].locations.add(chunkserver_id)
             
-            print(f"[Master] Registered chunkserver: {chunkserver_id}")
+            logger.info("[Master] Registered chunkserver: %s", chunkserver_id)
     
     def heartbeat(self, chunkserver_id: str):
         """Process heartbeat from chunkserver"""
-        with self.lock:
-            self.last_heartbeat[chunkserver_id] = time.time()
+        # Lock-free fast path: a single dict assignment is atomic under the
+        # GIL, and the 30s liveness threshold tolerates a slightly stale read
+        self.last_heartbeat[chunkserver_id] = time.time()
+        if chunkserver_id in self.live_chunkservers:
+            return
+        
+        with self.heartbeat_lock:
+            if chunkserver_id not in self.live_chunkservers:
+                self.live_chunkservers.add(chunkserver_id)
+                # Back from the dead: its heap entry was dropped, re-add it
+                info = self.chunkservers.get(chunkserver_id)
+                if info is not None:
+                    heapq.heappush(self.load_heap, (len(info['chunks']), chunkserver_id))
     
     def create_file(self, filename: str) -> bool:
         """Create a new file in the file_registry"""
-        with self.lock:
+        with self.lock.write_lock():
             if filename in self.file_registry:
                 return False
             
             self.file_registry[filename] = FileMetadata(filename=filename)
-            print(f"[Master] Created file: {filename}")
+            logger.info("[Master] Created file: %s", filename)
             return True
     
     def _allocate_chunk(self) -> str:
-        """Allocate a new chunk handle"""
-        chunk_id = hashlib.sha256(
-            f"{time.time()}{random.random()}".encode()
-        ).hexdigest()[:16]
-        return chunk_id
+        """Allocate a new chunk handle (caller holds the write lock)"""
+        self.next_chunk_handle += 1
+        return f"{self.next_chunk_handle:016x}"
     
     def _select_chunkservers(self, count: int) -> List[str]:
-        """Select chunkservers for chunk placement"""
-        available = [cs_id for cs_id in self.chunkservers.keys() 
-                    if time.time() - self.last_heartbeat.get(cs_id, 0) < 30]
-        return random.sample(available, min(count, len(available)))
+        """Select the least-loaded live chunkservers for chunk placement
+
+        Selected servers are popped from the load heap; the caller must
+        re-add them via _record_placement once the chunk is assigned.
+        """
+        selected = []
+        with self.heartbeat_lock:
+            while self.load_heap and len(selected) < count:
+                load, cs_id = heapq.heappop(self.load_heap)
+                if (cs_id in selected
+                        or cs_id not in self.live_chunkservers
+                        or load != len(self.chunkservers[cs_id]['chunks'])):
+                    continue  # Stale entry
+                selected.append(cs_id)
+        return selected
+    
+    def _record_placement(self, chunk_id: str, locations: List[str]):
+        """Charge a new chunk to its chunkservers and re-add them to the load heap"""
+        with self.heartbeat_lock:
+            for cs_id in locations:
+                chunks = self.chunkservers[cs_id]['chunks']
+                chunks.add(chunk_id)
+                heapq.heappush(self.load_heap, (len(chunks), cs_id))
+    
+    def _grant_primary(self, locations: List[str]) -> List[str]:
+        """Order replicas so the one holding the fewest primary leases leads
+
+        Placement ties break on chunkserver id, so without this the same
+        server would be primary for every chunk on a small cluster.
+        """
+        primary = min(locations, key=lambda cs_id: self.primary_counts.get(cs_id, 0))
+        self.primary_counts[primary] = self.primary_counts.get(primary, 0) + 1
+        return [primary] + [cs_id for cs_id in locations if cs_id != primary]
     
     def allocate_chunk_for_append(self, filename: str) -> Optional[Dict]:
         """Allocate a new chunk for append operation"""
-        with self.lock:
+        with self.lock.write_lock():
             if filename not in self.file_registry:
                 return None
             
@@ -88,6 +141,9 @@ class GFSMaster:
             if not locations:
                 return None
             
+            self._record_placement(chunk_id, locations)
+            locations = self._grant_primary(locations)
+            
             # Create chunk metadata
             self.chunk_metadata[chunk_id] = ChunkMetadata(
                 chunk_id=chunk_id,
@@ -101,8 +157,8 @@ class GFSMaster:
             file_metadata = self.file_registry[filename]
             file_metadata.chunk_ids.append(chunk_id)
             
-            print(f"[Master] Allocated chunk {chunk_id} for {filename}")
-            print(f"[Master] Primary: {locations[0]}, Replicas: {locations}")
+            logger.info("[Master] Allocated chunk %s for %s", chunk_id, filename)
+            logger.info("[Master] Primary: %s, Replicas: %s", locations[0], locations)
             
             return {
                 'chunk_id': chunk_id,
@@ -111,9 +167,15 @@ class GFSMaster:
                 'version': 1
             }
     
+    def update_file_size(self, filename: str, num_bytes: int):
+        """Record bytes successfully appended to a file"""
+        with self.lock.write_lock():
+            if filename in self.file_registry:
+                self.file_registry[filename].size += num_bytes
+    
     def get_chunk_locations(self, filename: str, chunk_index: int) -> Optional[Dict]:
         """Get locations for a specific chunk of a file"""
-        with self.lock:
+        with self.lock.read_lock():
             if filename not in self.file_registry:
                 return None
             
@@ -121,19 +183,34 @@ class GFSMaster:
             if chunk_index >= len(file_metadata.chunk_ids):
                 return None
             
-            chunk_id = file_metadata.chunk_ids[chunk_index]
-            chunk_metdata= self.chunk_metadata[chunk_id]
+            return self._chunk_info(file_metadata.chunk_ids[chunk_index])
+    
+    def get_file_layout(self, filename: str) -> Optional[Dict]:
+        """Get file size and every chunk's locations as one consistent snapshot"""
+        with self.lock.read_lock():
+            if filename not in self.file_registry:
+                return None
             
+            file_metadata = self.file_registry[filename]
             return {
-                'chunk_id': chunk_id,
-                'locations': list(chunk_metdata.locations),
-                'primary': chunk_metdata.primary,
-                'version': chunk_metdata.version
+                'filename': filename,
+                'size': file_metadata.size,
+                'chunks': [self._chunk_info(chunk_id) for chunk_id in file_metadata.chunk_ids]
             }
     
+    def _chunk_info(self, chunk_id: str) -> Dict:
+        """Build the client-facing view of a chunk (caller holds the lock)"""
+        chunk_metdata = self.chunk_metadata[chunk_id]
+        return {
+            'chunk_id': chunk_id,
+            'locations': list(chunk_metdata.locations),
+            'primary': chunk_metdata.primary,
+            'version': chunk_metdata.version
+        }
+    
     def get_file_info(self, filename: str) -> Optional[Dict]:
         """Get file metadata"""
-        with self.lock:
+        with self.lock.read_lock():
             if filename not in self.file_registry:
                 return None
             
@@ -146,20 +223,34 @@ class GFSMaster:
     
     def _monitor_chunkservers(self):
         """Monitor chunkserver health"""
-        while self.heartbeat_monitoring_active:
-            time.sleep(HEARTBEAT_INTERVAL)
-            with self.lock:
-                current_time = time.time()
-                dead_servers = []
-                
-                for cs_id, last_hb in self.last_heartbeat.items():
-                    if current_time - last_hb > 30:
+        while not self.heartbeat_stop.wait(HEARTBEAT_INTERVAL):
+            self._detect_dead_chunkservers()
+    
+    def _detect_dead_chunkservers(self) -> List[str]:
+        """Mark chunkservers without a recent heartbeat as dead"""
+        with self.heartbeat_lock:
+            current_time = time.time()
+            dead_servers = []
+            
+            # Snapshot: heartbeat() writes without taking the lock
+            for cs_id, last_hb in list(self.last_heartbeat.items()):
+                if current_time - last_hb > 30 and cs_id in self.live_chunkservers:
+                    # Discard first, then re-read: a heartbeat that lands
+                    # before the re-read is seen here, and one that lands
+                    # after finds the server not live and revives it through
+                    # the locked path in heartbeat()
+                    self.live_chunkservers.discard(cs_id)
+                    if current_time - self.last_heartbeat[cs_id] <= 30:
+                        self.live_chunkservers.add(cs_id)
+                    else:
                         dead_servers.append(cs_id)
-                
-                for cs_id in dead_servers:
-                    print(f"[Master] Chunkserver {cs_id} appears dead")
-                    # In production: trigger re-replication
+        
+        for cs_id in dead_servers:
+            logger.warning("[Master] Chunkserver %s appears dead", cs_id)
+            # In production: trigger re-replication
+        return dead_servers
     
     def shutdown_heartbeat_monitoring(self):
         """Shutdown heartbeat monitoring"""
-        self.heartbeat_monitoring_active = False
\ No newline at end of file
+        self.heartbeat_stop.set()
+        self.heartbeat_monitor_thread.join()
\ No newline at end of file
@@ -1,7 +1,7 @@
 from typing import List, Set, Optional
 from dataclasses import dataclass, field
 
-@dataclass
+@dataclass(slots=True)
 class ChunkMetadata:
     """Metadata for a single chunk"""
     chunk_id: str
@@ -10,7 +10,7 @@ class ChunkMetadata:
     primary: Optional[str] = None
     lease_expiry: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class FileMetadata:
     """Metadata for a file"""
     filename: str
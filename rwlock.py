@@ -0,0 +1,47 @@
+import threading
+from contextlib import contextmanager
+
+
+class RWLock:
+    """Reader-writer lock - many concurrent readers or a single writer
+
+    Waiting writers block new readers, so a steady stream of lookups
+    cannot starve allocations. Not reentrant.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.active_readers = 0
+        self.waiting_writers = 0
+        self.writer_active = False
+
+    @contextmanager
+    def read_lock(self):
+        """Hold the lock shared for the duration of the block"""
+        with self.condition:
+            while self.writer_active or self.waiting_writers:
+                self.condition.wait()
+            self.active_readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active_readers -= 1
+                if self.active_readers == 0:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def write_lock(self):
+        """Hold the lock exclusively for the duration of the block"""
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer_active or self.active_readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer_active = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer_active = False
+                self.condition.notify_all()
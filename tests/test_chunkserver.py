@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chunkserver
+from master import GFSMaster
+from chunkserver import GFSChunkserver, CHUNKS_PER_SLAB
+from client import GFSClient
+
+
+class TestChunkBufferPool(unittest.TestCase):
+    def setUp(self):
+        self.master = GFSMaster()
+        self.chunkserver = GFSChunkserver("chunkserver-1", self.master)
+
+    def tearDown(self):
+        self.master.shutdown_heartbeat_monitoring()
+        self.chunkserver.shutdown()
+
+    def test_chunks_share_a_slab_until_it_is_full(self):
+        for i in range(CHUNKS_PER_SLAB + 1):
+            self.assertTrue(self.chunkserver.create_chunk(f"chunk-{i}", 1))
+
+        self.assertEqual(len(self.chunkserver.slabs), 2)
+
+    def test_chunks_in_a_slab_do_not_overlap(self):
+        self.chunkserver.create_chunk("chunk-a", 1)
+        self.chunkserver.create_chunk("chunk-b", 1)
+        self.chunkserver.append_data_to_chunk("chunk-a", b"aaaa", 0)
+        self.chunkserver.append_data_to_chunk("chunk-b", b"bb", 0)
+
+        self.assertEqual(bytes(self.chunkserver.read_chunk("chunk-a", 0, 8)), b"aaaa")
+        self.assertEqual(bytes(self.chunkserver.read_chunk("chunk-b", 0, 8)), b"bb")
+
+    def test_mapping_failure_fails_create_and_append(self):
+        client = GFSClient(self.master, {"chunkserver-1": self.chunkserver})
+        client.create("/data/file")
+        self.chunkserver.slab_slots_used = CHUNKS_PER_SLAB  # force a new slab
+
+        with mock.patch.object(chunkserver.mmap, "mmap", side_effect=OSError(12, "Cannot allocate memory")):
+            self.assertFalse(self.chunkserver.create_chunk("chunk-x", 1))
+            self.assertFalse(client.append("/data/file", b"data"))
+        client.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from master import GFSMaster
+from chunkserver import GFSChunkserver
+from client import GFSClient
+
+
+class TestClientMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.master = GFSMaster()
+        self.chunkservers = {
+            cs_id: GFSChunkserver(cs_id, self.master)
+            for cs_id in ("chunkserver-1", "chunkserver-2", "chunkserver-3")
+        }
+        self.client = GFSClient(self.master, self.chunkservers)
+        self.client.create("/data/file")
+        self.client.append("/data/file", b"old")
+
+    def tearDown(self):
+        self.client.shutdown()
+        self.master.shutdown_heartbeat_monitoring()
+        for chunkserver in self.chunkservers.values():
+            chunkserver.shutdown()
+
+    def test_read_during_append_does_not_cache_stale_metadata(self):
+        allocate = self.master.allocate_chunk_for_append
+        concurrent_reads = []
+
+        def allocate_with_concurrent_read(filename):
+            concurrent_reads.append(self.client.read(filename))
+            return allocate(filename)
+
+        self.master.allocate_chunk_for_append = allocate_with_concurrent_read
+        self.assertTrue(self.client.append("/data/file", b"NEW"))
+        self.master.allocate_chunk_for_append = allocate
+
+        self.assertEqual(concurrent_reads, [b"old"])
+        self.assertEqual(self.client.read("/data/file"), b"oldNEW")
+
+    def test_fetch_racing_invalidation_is_not_cached(self):
+        get_file_layout = self.master.get_file_layout
+
+        def get_file_layout_racing_append(filename):
+            layout = get_file_layout(filename)
+            self.client._invalidate_metadata(filename)
+            return layout
+
+        self.master.get_file_layout = get_file_layout_racing_append
+        self.client.read("/data/file")
+        self.master.get_file_layout = get_file_layout
+
+        self.assertNotIn("/data/file", self.client.metadata_cache)
+
+    def test_read_takes_one_master_snapshot(self):
+        with mock.patch.object(self.master, "get_file_layout", wraps=self.master.get_file_layout) as layout, \
+                mock.patch.object(self.master, "get_file_info") as file_info, \
+                mock.patch.object(self.master, "get_chunk_locations") as chunk_locations:
+            self.assertEqual(self.client.read("/data/file"), b"old")
+
+        layout.assert_called_once_with("/data/file")
+        file_info.assert_not_called()
+        chunk_locations.assert_not_called()
+
+    def test_failed_append_invalidates_cache(self):
+        self.client.read("/data/file")
+        self.assertIn("/data/file", self.client.metadata_cache)
+
+        self.client.chunkservers = {}
+        self.assertFalse(self.client.append("/data/file", b"lost"))
+        self.assertNotIn("/data/file", self.client.metadata_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
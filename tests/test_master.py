@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from master import GFSMaster
+
+
+class TestMasterPlacement(unittest.TestCase):
+    def setUp(self):
+        self.master = GFSMaster()
+        for cs_id in ("chunkserver-1", "chunkserver-2", "chunkserver-3"):
+            self.master.register_chunkserver(cs_id, [])
+        self.master.create_file("/data/file")
+
+    def tearDown(self):
+        self.master.shutdown_heartbeat_monitoring()
+
+    def test_primary_rotates_when_all_servers_hold_every_chunk(self):
+        primaries = [self.master.allocate_chunk_for_append("/data/file")['primary']
+                     for _ in range(6)]
+
+        self.assertEqual(sorted(primaries),
+                         ["chunkserver-1", "chunkserver-1",
+                          "chunkserver-2", "chunkserver-2",
+                          "chunkserver-3", "chunkserver-3"])
+
+    def test_primary_leads_locations(self):
+        chunk_info = self.master.allocate_chunk_for_append("/data/file")
+
+        self.assertEqual(chunk_info['locations'][0], chunk_info['primary'])
+        self.assertEqual(self.master.get_chunk_locations("/data/file", 0)['primary'],
+                         chunk_info['primary'])
+
+
+
+class TestMasterHeartbeats(unittest.TestCase):
+    def setUp(self):
+        self.master = GFSMaster()
+        self.master.register_chunkserver("chunkserver-1", [])
+
+    def tearDown(self):
+        self.master.shutdown_heartbeat_monitoring()
+
+    def test_silent_chunkserver_is_marked_dead(self):
+        self.master.last_heartbeat["chunkserver-1"] = time.time() - 60
+
+        self.assertEqual(self.master._detect_dead_chunkservers(), ["chunkserver-1"])
+        self.assertNotIn("chunkserver-1", self.master.live_chunkservers)
+
+    def test_heartbeat_after_snapshot_keeps_chunkserver_live(self):
+        self.master.last_heartbeat["chunkserver-1"] = time.time() - 60
+        master = self.master
+
+        class HeartbeatOnSnapshot(dict):
+            """Deliver a heartbeat right after the monitor snapshots"""
+            def items(self):
+                snapshot = list(super().items())
+                master.heartbeat("chunkserver-1")
+                return snapshot
+
+        self.master.last_heartbeat = HeartbeatOnSnapshot(self.master.last_heartbeat)
+
+        self.assertEqual(self.master._detect_dead_chunkservers(), [])
+        self.assertIn("chunkserver-1", self.master.live_chunkservers)
+
+    def _race_heartbeat_with_reread(self, heartbeat_first: bool):
+        """Run the monitor with a heartbeat landing inside its timestamp re-read"""
+        self.master.last_heartbeat["chunkserver-1"] = time.time() - 60
+        master = self.master
+        heartbeat_threads = []
+
+        class HeartbeatOnReread(dict):
+            def __setitem__(self, key, value):
+                super().__setitem__(key, value)
+                self.written.set()
+
+            def __getitem__(self, key):
+                # heartbeat() only writes, so every read is the monitor's
+                # re-read. Run the heartbeat on another thread because the
+                # monitor holds heartbeat_lock and the lock is not reentrant.
+                self.written = threading.Event()
+                if not heartbeat_first:
+                    value = super().__getitem__(key)
+                thread = threading.Thread(target=master.heartbeat, args=(key,))
+                thread.start()
+                heartbeat_threads.append(thread)
+                self.written.wait(5)
+                if heartbeat_first:
+                    value = super().__getitem__(key)
+                return value
+
+        self.master.last_heartbeat = HeartbeatOnReread(self.master.last_heartbeat)
+        dead_servers = self.master._detect_dead_chunkservers()
+        for thread in heartbeat_threads:
+            thread.join(5)
+        return dead_servers
+
+    def test_heartbeat_before_reread_keeps_chunkserver_live(self):
+        self.assertEqual(self._race_heartbeat_with_reread(heartbeat_first=True), [])
+        self.assertIn("chunkserver-1", self.master.live_chunkservers)
+
+    def test_heartbeat_after_reread_revives_chunkserver(self):
+        self._race_heartbeat_with_reread(heartbeat_first=False)
+
+        self.assertIn("chunkserver-1", self.master.live_chunkservers)
+        self.assertIn("chunkserver-1", [cs_id for _, cs_id in self.master.load_heap])
+
+
+if __name__ == "__main__":
+    unittest.main()